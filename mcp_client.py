@@ -7,6 +7,8 @@ Connects to MCP server and demonstrates tool usage
 import asyncio
 import logging
 import json
+import re
+import shlex
 import sys
 from typing import Any, Dict, List, Optional
 from mcp import ClientSession, StdioServerParameters
@@ -17,171 +19,230 @@ import mcp.types as types
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Matches verb and argument of an interactive command in one pass; the
+# verb set mirrors the command-handler dict plus the quit aliases
+_CMD_RE = re.compile(
+    r'^(help|tools|quit|exit|q|calc|ls|read|write)(?:\s+(.*))?$',
+    re.IGNORECASE,
+)
+
+# Interned tool-name and argument-key strings: comparisons and dict
+# lookups on these take the pointer-identity fast path
+_T_CALCULATE = sys.intern("calculate")
+_T_LIST_FILES = sys.intern("list_files")
+_T_READ_FILE = sys.intern("read_file")
+_T_WRITE_FILE = sys.intern("write_file")
+_T_BATCH_EXECUTE = sys.intern("batch_execute")
+_K_EXPRESSION = sys.intern("expression")
+_K_DIRECTORY = sys.intern("directory")
+_K_FILEPATH = sys.intern("filepath")
+_K_CONTENT = sys.intern("content")
+
 class SimpleMCPClient:
-    def __init__(self):
-        self.tools = []
+    """MCP client that holds one server connection across operations.
 
-    async def run_with_server(self, server_command: List[str], operation: str):
-        """Run client operations with server connection"""
-        try:
-            # Create server parameters for stdio connection
-            server_params = StdioServerParameters(
-                command=server_command[0],
-                args=server_command[1:] if len(server_command) > 1 else []
-            )
+    Used as an async context manager: the server subprocess is spawned and
+    the MCP handshake performed once on entry, then any number of
+    operations (demo, interactive session, direct tool calls) share the
+    same session until exit.
+    """
 
-            print(f"Connecting to server with command: {' '.join(server_command)}")
+    def __init__(self, server_command: List[str]):
+        self.server_command = server_command
+        self.session: Optional[ClientSession] = None
+        self.tools = []
+        # Bound concurrency so a stdio (single-threaded) server isn't flooded
+        # when tool calls are dispatched in parallel
+        self._call_semaphore = asyncio.Semaphore(8)
+        self._stdio_cm = None
+        self._session_cm = None
+        self._calc_args = {_K_EXPRESSION: None}
+        self._tool_list_str = None
+        # Interactive command dispatch: verb -> handler(rest-of-line),
+        # built once instead of re-testing prefixes on every input line
+        self._command_handlers = {
+            "help": self._cmd_help,
+            "tools": self._cmd_tools,
+            "calc": self._cmd_calc,
+            "ls": self._cmd_ls,
+            "read": self._cmd_read,
+            "write": self._cmd_write,
+        }
+
+    async def __aenter__(self) -> "SimpleMCPClient":
+        server_params = StdioServerParameters(
+            command=self.server_command[0],
+            args=self.server_command[1:] if len(self.server_command) > 1 else []
+        )
+
+        print(f"Connecting to server with command: {' '.join(self.server_command)}")
 
-            # Use async context managers properly
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    # Initialize the session
-                    await session.initialize()
+        try:
+            self._stdio_cm = stdio_client(server_params)
+            read, write = await self._stdio_cm.__aenter__()
 
-                    logger.info("Successfully connected to MCP server")
+            self._session_cm = ClientSession(read, write)
+            self.session = await self._session_cm.__aenter__()
+            await self.session.initialize()
 
-                    # List available tools
-                    await self.list_tools(session)
+            # Reusable argument template for the calc() fast path, bound
+            # per session so high-frequency calls skip a dict allocation
+            self._calc_args = {_K_EXPRESSION: None}
 
-                    # Execute the requested operation
-                    if operation == "demo":
-                        await self.run_demo(session)
-                    elif operation == "interactive":
-                        await self.interactive_session(session)
+            logger.info("Successfully connected to MCP server")
+            return self
 
         except Exception as e:
-            logger.error(f"Client error: {e}")
+            logger.error("Client error: %s", e)
+            await self.__aexit__(type(e), e, e.__traceback__)
             raise
 
-    async def list_tools(self, session: ClientSession):
-        """List available tools from server"""
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.session = None
+        try:
+            if self._session_cm is not None:
+                await self._session_cm.__aexit__(exc_type, exc_value, traceback)
+        finally:
+            self._session_cm = None
+            if self._stdio_cm is not None:
+                stdio_cm, self._stdio_cm = self._stdio_cm, None
+                await stdio_cm.__aexit__(exc_type, exc_value, traceback)
+
+    async def list_tools(self):
+        """List available tools from server, refreshing the cached listing"""
         try:
-            result = await session.list_tools()
+            result = await self.session.list_tools()
             self.tools = result.tools
 
-            print("\n=== Available Tools ===")
-            for tool in self.tools:
-                print(f"• {tool.name}: {tool.description}")
-            print()
+            # Format once and emit with a single write instead of one
+            # print (and one stdout lock/flush) per tool; the cached
+            # string also serves repeat 'tools' commands
+            lines = ["\n=== Available Tools ===",
+                     *(f"• {tool.name}: {tool.description}" for tool in self.tools),
+                     ""]
+            self._tool_list_str = "\n".join(lines) + "\n"
+            sys.stdout.write(self._tool_list_str)
 
         except Exception as e:
-            logger.error(f"Failed to list tools: {e}")
+            logger.error("Failed to list tools: %s", e)
 
-    async def call_tool(self, session: ClientSession, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool on the server"""
         try:
-            result = await session.call_tool(tool_name, arguments)
+            async with self._call_semaphore:
+                result = await self.session.call_tool(tool_name, arguments)
 
-            # Extract text content from result
-            if result.content:
-                for content in result.content:
-                    if hasattr(content, 'text'):
-                        return content.text
-
-            return "No content returned"
+            # Extract text content from result, keeping every part in
+            # order - tools may return multi-part content
+            texts = [content.text for content in (result.content or ())
+                     if hasattr(content, 'text')]
+            return "\n".join(texts) if texts else "No content returned"
 
         except Exception as e:
-            logger.error(f"Error calling tool {tool_name}: {e}")
+            logger.error("Error calling tool %s: %s", tool_name, e)
             return f"Error: {str(e)}"
 
+    async def calc(self, expression: str) -> Any:
+        """Call the calculate tool, reusing a preallocated argument dict.
+
+        The template is repopulated in place, so this path must not be
+        used for concurrent calls (pass a fresh dict to call_tool for
+        those); sequential interactive use is safe.
+        """
+        self._calc_args[_K_EXPRESSION] = expression
+        return await self.call_tool(_T_CALCULATE, self._calc_args)
+
     def parse_command_args(self, command_line: str) -> List[str]:
         """Parse command line arguments, handling quoted strings"""
-        args = []
-        current_arg = ""
-        in_quotes = False
-        quote_char = None
-
-        i = 0
-        while i < len(command_line):
-            char = command_line[i]
-
-            if not in_quotes:
-                if char in ['"', "'"]:
-                    in_quotes = True
-                    quote_char = char
-                elif char == ' ':
-                    if current_arg:
-                        args.append(current_arg)
-                        current_arg = ""
-                else:
-                    current_arg += char
-            else:  # in_quotes
-                if char == quote_char:
-                    in_quotes = False
-                    quote_char = None
-                else:
-                    current_arg += char
-
-            i += 1
-
-        # Add the last argument if there is one
-        if current_arg:
-            args.append(current_arg)
-
-        return args
-
-    async def interactive_session(self, session: ClientSession):
+        try:
+            return shlex.split(command_line)
+        except ValueError:
+            # Unbalanced quotes - treat as no usable arguments
+            return []
+
+    async def interactive_session(self):
         """Run interactive session with the server"""
         print("\n=== Interactive MCP Client Session ===")
         print("Type 'help' for available commands, 'quit' to exit")
 
         while True:
             try:
-                command = input("\nmcp> ").strip()
+                # Read input on a worker thread so the event loop keeps
+                # running (server notifications, background tasks) while
+                # the user is typing
+                command = (await asyncio.to_thread(input, "\nmcp> ")).strip()
 
-                if command.lower() in ['quit', 'exit', 'q']:
-                    break
-                elif command.lower() == 'help':
-                    await self.show_help()
-                elif command.lower() == 'tools':
-                    await self.list_tools(session)
-                elif command.startswith('calc '):
-                    expression = command[5:].strip()
-                    if expression:
-                        result = await self.call_tool(session, "calculate", {"expression": expression})
-                        print(f"Result: {result}")
-                    else:
-                        print("Usage: calc <expression>")
-                elif command.startswith('ls'):
-                    parts = command.split()
-                    directory = parts[1] if len(parts) > 1 else "."
-                    result = await self.call_tool(session, "list_files", {"directory": directory})
-                    print(result)
-                elif command.startswith('read '):
-                    filepath = command[5:].strip()
-                    if filepath:
-                        result = await self.call_tool(session, "read_file", {"filepath": filepath})
-                        print(result)
-                    else:
-                        print("Usage: read <filepath>")
-                elif command.startswith('write '):
-                    # Parse the write command using proper argument parsing
-                    args = self.parse_command_args(command[6:].strip())
-
-                    if len(args) >= 2:
-                        filepath = args[0]
-                        # Join all remaining args as content (in case content has spaces)
-                        content = ' '.join(args[1:])
-
-                        result = await self.call_tool(session, "write_file", {
-                            "filepath": filepath,
-                            "content": content
-                        })
-                        print(result)
-                    else:
-                        print("Usage: write <filepath> <content>")
-                        print("       write <filepath> \"<content with spaces>\"")
-                elif command == "":
+                if not command:
                     continue
-                else:
+
+                match = _CMD_RE.match(command)
+                if match is None:
                     print(f"Unknown command: {command}")
                     print("Type 'help' for available commands")
+                    continue
+
+                verb = match.group(1).lower()
+                rest = (match.group(2) or '').strip()
+
+                if verb in ('quit', 'exit', 'q'):
+                    break
+
+                await self._command_handlers[verb](rest)
 
             except KeyboardInterrupt:
                 print("\nUse 'quit' to exit")
             except Exception as e:
                 print(f"Error: {e}")
 
+    async def _cmd_help(self, rest: str):
+        await self.show_help()
+
+    async def _cmd_tools(self, rest: str):
+        # The tool set is fixed for the life of the server, so serve
+        # repeat requests from the cached listing
+        if self._tool_list_str is not None:
+            sys.stdout.write(self._tool_list_str)
+        else:
+            await self.list_tools()
+
+    async def _cmd_calc(self, rest: str):
+        if rest:
+            result = await self.calc(rest)
+            print(f"Result: {result}")
+        else:
+            print("Usage: calc <expression>")
+
+    async def _cmd_ls(self, rest: str):
+        parts = rest.split()
+        directory = parts[0] if parts else "."
+        result = await self.call_tool(_T_LIST_FILES, {_K_DIRECTORY: directory})
+        print(result)
+
+    async def _cmd_read(self, rest: str):
+        if rest:
+            result = await self.call_tool(_T_READ_FILE, {_K_FILEPATH: rest})
+            print(result)
+        else:
+            print("Usage: read <filepath>")
+
+    async def _cmd_write(self, rest: str):
+        # Parse the write command using proper argument parsing
+        args = self.parse_command_args(rest)
+
+        if len(args) >= 2:
+            filepath = args[0]
+            # Join all remaining args as content (in case content has spaces)
+            content = ' '.join(args[1:])
+
+            result = await self.call_tool(_T_WRITE_FILE, {
+                _K_FILEPATH: filepath,
+                _K_CONTENT: content
+            })
+            print(result)
+        else:
+            print("Usage: write <filepath> <content>")
+            print("       write <filepath> \"<content with spaces>\"")
+
     async def show_help(self):
         """Show help information"""
         print("\n=== Available Commands ===")
@@ -195,37 +256,48 @@ class SimpleMCPClient:
         print("quit              - Exit the client")
         print()
 
-    async def run_demo(self, session: ClientSession):
+    async def run_demo(self):
         """Run a demonstration of the client capabilities"""
-        print("\n=== MCP Client Demo ===")
+        # The demo is not interactive, so collect all output and emit it
+        # with one write instead of a dozen separate print calls
+        out = ["\n=== MCP Client Demo ==="]
 
-        # Demo calculations
-        print("\n1. Mathematical calculations:")
+        # Demo calculations - send all expressions in one batch_execute
+        # request so the whole block costs a single round-trip
+        out.append("\n1. Mathematical calculations:")
         expressions = ["2 + 3 * 4", "sqrt(16)", "pi * 2", "sin(pi/2)"]
-        for expr in expressions:
-            result = await self.call_tool(session, "calculate", {"expression": expr})
-            print(f"  {expr} = {result}")
+        batch = [{"tool": _T_CALCULATE, "args": {_K_EXPRESSION: expr}}
+                 for expr in expressions]
+        result = await self.call_tool(_T_BATCH_EXECUTE, {"calls": batch})
+        results = result.splitlines()
+        if len(results) == len(expressions):
+            out.extend(f"  {expr} = {res}"
+                       for expr, res in zip(expressions, results))
+        else:
+            out.append(f"  {result}")
 
         # Demo file operations
-        print("\n2. File operations:")
-
-        # List current directory
-        result = await self.call_tool(session, "list_files", {"directory": "."})
-        print(f"  Current directory contents:\n  {result}")
+        out.append("\n2. File operations:")
 
-        # Write a test file
+        # The directory listing is independent of the write, so run them
+        # concurrently; the read below must wait for the write to finish
         test_content = "Hello from MCP Client!\nThis is a test file."
-        result = await self.call_tool(session, "write_file", {
-            "filepath": "test_file.txt",
-            "content": test_content
-        })
-        print(f"  Write result: {result}")
+        list_result, write_result = await asyncio.gather(
+            self.call_tool(_T_LIST_FILES, {_K_DIRECTORY: "."}),
+            self.call_tool(_T_WRITE_FILE, {
+                _K_FILEPATH: "test_file.txt",
+                _K_CONTENT: test_content
+            })
+        )
+        out.append(f"  Current directory contents:\n  {list_result}")
+        out.append(f"  Write result: {write_result}")
 
         # Read the test file
-        result = await self.call_tool(session, "read_file", {"filepath": "test_file.txt"})
-        print(f"  Read result: {result}")
+        result = await self.call_tool(_T_READ_FILE, {_K_FILEPATH: "test_file.txt"})
+        out.append(f"  Read result: {result}")
 
-        print("\nDemo completed!")
+        out.append("\nDemo completed!")
+        sys.stdout.write("\n".join(out) + "\n")
 
 async def main():
     if len(sys.argv) < 2:
@@ -248,15 +320,26 @@ async def main():
     if mode == "server" and len(sys.argv) > 2:
         server_command = sys.argv[2:]
 
-    client = SimpleMCPClient()
-
-    if mode == "demo":
-        await client.run_with_server(server_command, "demo")
-    elif mode == "interactive":
-        await client.run_with_server(server_command, "interactive")
-    else:
+    if mode not in ("demo", "interactive"):
         print(f"Unknown mode: {mode}")
         return
 
+    # One subprocess and one MCP handshake for the whole run
+    async with SimpleMCPClient(server_command) as client:
+        await client.list_tools()
+
+        if mode == "demo":
+            await client.run_demo()
+        else:
+            await client.interactive_session()
+
 if __name__ == "__main__":
+    # Prefer uvloop where available - faster pipe IO and task scheduling
+    # for the stdio transport; stdlib asyncio is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
@@ -4,10 +4,14 @@ Simple MCP Server implementation
 Provides basic math operations and file system tools
 """
 
+import ast
 import asyncio
+import io
 import logging
 import os
 import math
+from functools import lru_cache
+from types import MappingProxyType
 from mcp.server.fastmcp import FastMCP
 
 # Configure logging
@@ -17,6 +21,61 @@ logger = logging.getLogger(__name__)
 # Create the MCP server
 mcp = FastMCP("simple-mcp-server")
 
+# Names allowed in calculate() expressions. math.__dict__ is static, so
+# build this once at import time instead of on every call; the proxy
+# keeps evaluated expressions from mutating the shared mapping.
+_ALLOWED_NAMES = MappingProxyType({
+    **{k: v for k, v in math.__dict__.items() if not k.startswith("__")},
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "pow": pow,
+})
+
+# eval() requires a real dict for globals, so this one stays mutable
+_ALLOWED_GLOBALS = {"__builtins__": {}}
+
+# Refuse to inline files larger than this into a tool result
+_MAX_READ_BYTES = 10 * 1024 * 1024
+
+# Chunk size for streaming file reads
+_READ_CHUNK_SIZE = 64 * 1024
+
+# AST node types permitted in expressions: arithmetic, unary signs,
+# name lookups and calls into _ALLOWED_NAMES - nothing else
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+    ast.Name, ast.Load, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv,
+    ast.Pow, ast.Mod, ast.USub, ast.UAdd,
+)
+
+@lru_cache(maxsize=512)
+def _compile_expression(expression: str):
+    """Validate an expression against the node whitelist and compile it.
+
+    Cached so repeated expressions skip the parse/validate/compile pass.
+    """
+    tree = ast.parse(expression, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"unsupported constant: {node.value!r}")
+    return compile(tree, "<calc>", "eval")
+
+@lru_cache(maxsize=1024)
+def _eval_expression(expression: str) -> str:
+    """Evaluate an expression and format the result.
+
+    Results are pure strings derived only from the expression, so repeat
+    calls (agents re-issue the same expressions often) become a cache hit.
+    """
+    result = eval(_compile_expression(expression), _ALLOWED_GLOBALS, _ALLOWED_NAMES)
+    return f"Result: {expression} = {result}"
+
 @mcp.tool()
 def calculate(expression: str) -> str:
     """Perform basic mathematical calculations
@@ -27,23 +86,7 @@ def calculate(expression: str) -> str:
     try:
         # Safe evaluation of mathematical expressions
         # Only allow basic math operations
-        allowed_names = {
-            k: v for k, v in math.__dict__.items()
-            if not k.startswith("__")
-        }
-        allowed_names.update({
-            "abs": abs,
-            "round": round,
-            "min": min,
-            "max": max,
-            "sum": sum,
-            "pow": pow,
-        })
-
-        # Evaluate the expression safely
-        result = eval(expression, {"__builtins__": {}}, allowed_names)
-
-        return f"Result: {expression} = {result}"
+        return _eval_expression(expression)
 
     except Exception as e:
         return f"Calculation error: {str(e)}"
@@ -56,21 +99,22 @@ def list_files(directory: str = ".") -> str:
         directory: Directory path to list files from (defaults to current directory)
     """
     try:
-        if not os.path.exists(directory):
-            return f"Directory does not exist: {directory}"
-
-        files = []
-        for item in os.listdir(directory):
-            item_path = os.path.join(directory, item)
-            if os.path.isfile(item_path):
-                files.append(f"📄 {item}")
-            elif os.path.isdir(item_path):
-                files.append(f"📁 {item}/")
-
-        files_list = "\n".join(sorted(files))
+        # scandir reuses the type information the OS already returned,
+        # avoiding a separate stat() per entry. Sort on the bare names
+        # (directories first, case-insensitive) before formatting, so the
+        # comparisons never scan past the emoji prefix
+        with os.scandir(directory) as it:
+            entries = sorted(((entry.is_dir(), entry.name) for entry in it),
+                             key=lambda t: (not t[0], t[1].lower()))
+        files = [f"📁 {name}/" if is_dir else f"📄 {name}"
+                 for is_dir, name in entries]
+
+        files_list = "\n".join(files)
 
         return f"Files in {directory}:\n{files_list}"
 
+    except FileNotFoundError:
+        return f"Directory does not exist: {directory}"
     except Exception as e:
         return f"Error listing files: {str(e)}"
 
@@ -82,14 +126,25 @@ def read_file(filepath: str) -> str:
         filepath: Path to the file to read
     """
     try:
-        if not os.path.exists(filepath):
-            return f"File does not exist: {filepath}"
-
+        # Open directly instead of probing with os.path.exists first -
+        # one syscall path and no check-then-open race
         with open(filepath, 'r', encoding='utf-8') as file:
-            content = file.read()
-
-        return f"Contents of {filepath}:\n\n{content}"
-
+            size = os.fstat(file.fileno()).st_size
+            if size > _MAX_READ_BYTES:
+                return (f"File too large to read: {filepath} "
+                        f"({size} bytes, limit is {_MAX_READ_BYTES})")
+
+            # Stream in chunks instead of slurping the whole file at once,
+            # so peak memory stays bounded by the chunk size plus the result
+            buffer = io.StringIO()
+            buffer.write(f"Contents of {filepath}:\n\n")
+            for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), ''):
+                buffer.write(chunk)
+
+        return buffer.getvalue()
+
+    except FileNotFoundError:
+        return f"File does not exist: {filepath}"
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
@@ -107,13 +162,53 @@ def write_file(filepath: str, content: str) -> str:
         if directory:
             os.makedirs(directory, exist_ok=True)
 
-        with open(filepath, 'w', encoding='utf-8') as file:
-            file.write(content)
+        # Encode once and write the bytes directly, skipping the text
+        # layer's incremental encoder and newline translation
+        data = content.encode('utf-8')
+        with open(filepath, 'wb') as file:
+            file.write(data)
 
-        return f"Successfully wrote {len(content)} characters to {filepath}"
+        return f"Successfully wrote {len(data)} bytes to {filepath}"
 
     except Exception as e:
         return f"Error writing file: {str(e)}"
 
+# Tools that batch_execute may dispatch to (the decorated functions are
+# still directly callable)
+_BATCH_TOOLS = {
+    "calculate": calculate,
+    "list_files": list_files,
+    "read_file": read_file,
+    "write_file": write_file,
+}
+
+@mcp.tool()
+async def batch_execute(calls: list) -> list:
+    """Execute several tool calls in a single request
+
+    Args:
+        calls: List of {"tool": name, "args": arguments} entries; supported
+            tools are calculate, list_files, read_file and write_file
+    """
+    async def run_one(call: dict) -> str:
+        tool = call.get("tool")
+        fn = _BATCH_TOOLS.get(tool)
+        if fn is None:
+            return f"Unknown tool: {tool}"
+        try:
+            return fn(**call.get("args", {}))
+        except Exception as e:
+            return f"Error in {tool}: {str(e)}"
+
+    return list(await asyncio.gather(*(run_one(call) for call in calls)))
+
 if __name__ == "__main__":
+    # Prefer uvloop where available - faster pipe IO and task scheduling
+    # for the stdio transport; stdlib asyncio is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     mcp.run()